@@ -1,4 +1,5 @@
 import os
+import json
 import time
 import random
 from flask import Flask, request
@@ -7,6 +8,7 @@ from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExport
 from opentelemetry.exporter.otlp.proto.grpc.metric_exporter import OTLPMetricExporter
 from opentelemetry.sdk.trace import TracerProvider
 from opentelemetry.sdk.trace.export import BatchSpanProcessor
+from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
 from opentelemetry.sdk.metrics import MeterProvider
 from opentelemetry.sdk.metrics.export import PeriodicExportingMetricReader
 from opentelemetry.sdk.resources import Resource
@@ -14,6 +16,9 @@ from opentelemetry.instrumentation.flask import FlaskInstrumentor
 from opentelemetry.instrumentation.requests import RequestsInstrumentor
 from opentelemetry.instrumentation.sqlalchemy import SQLAlchemyInstrumentor
 
+# Simulated work latency (set SIMULATE_LATENCY=0 to benchmark the telemetry pipeline)
+SIMULATE = os.getenv("SIMULATE_LATENCY", "1") == "1"
+
 # Setup Resource
 resource = Resource.create({
     "service.name": "python-demo-app",
@@ -24,20 +29,32 @@ resource = Resource.create({
 otlp_endpoint = os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT", "http://localhost:4317")
 
 trace_exporter = OTLPSpanExporter(endpoint=otlp_endpoint)
-trace_provider = TracerProvider(resource=resource)
-trace_provider.add_span_processor(BatchSpanProcessor(trace_exporter))
+trace_sampler = ParentBased(TraceIdRatioBased(float(os.getenv("OTEL_TRACES_SAMPLER_ARG", "0.1"))))
+trace_provider = TracerProvider(resource=resource, sampler=trace_sampler)
+trace_provider.add_span_processor(BatchSpanProcessor(
+    trace_exporter,
+    max_queue_size=int(os.getenv("OTEL_BSP_MAX_QUEUE_SIZE", "4096")),
+    schedule_delay_millis=int(os.getenv("OTEL_BSP_SCHEDULE_DELAY", "1000")),
+    max_export_batch_size=int(os.getenv("OTEL_BSP_MAX_EXPORT_BATCH_SIZE", "128")),
+    export_timeout_millis=int(os.getenv("OTEL_BSP_EXPORT_TIMEOUT", "10000"))
+))
 trace.set_tracer_provider(trace_provider)
 
 metric_exporter = OTLPMetricExporter(endpoint=otlp_endpoint)
-metric_reader = PeriodicExportingMetricReader(metric_exporter)
+metric_reader = PeriodicExportingMetricReader(
+    metric_exporter,
+    export_interval_millis=int(os.getenv("OTEL_METRIC_EXPORT_INTERVAL", "60000")),
+    export_timeout_millis=int(os.getenv("OTEL_METRIC_EXPORT_TIMEOUT", "30000"))
+)
 meter_provider = MeterProvider(resource=resource, metric_readers=[metric_reader])
 metrics.set_meter_provider(meter_provider)
 
 # Initialize Flask app
 app = Flask(__name__)
 
-# Auto-instrument Flask and Requests
-FlaskInstrumentor().instrument_app(app)
+# Auto-instrument Flask and Requests (health probes are not traced).
+# excluded_urls is a regex searched in the full URL, so anchor it to /health only
+FlaskInstrumentor().instrument_app(app, excluded_urls="/health$")
 RequestsInstrumentor().instrument()
 
 # Get tracer
@@ -56,16 +73,25 @@ request_duration = meter.create_histogram(
     description="Request duration in milliseconds"
 )
 
+# Metric attribute sets, shared across requests
+_ATTR_USERS = {"endpoint": "/api/users"}
+_ATTR_PROCESS = {"endpoint": "/api/process"}
+_ATTR_ERROR = {"endpoint": "/api/error", "status": "error"}
+
+# Static responses, serialized once at startup
+_INDEX_JSON = json.dumps({
+    "message": "Hello from OTEL Demo App!",
+    "endpoints": [
+        "/api/users",
+        "/api/process",
+        "/health"
+    ]
+})
+_HEALTH_JSON = json.dumps({"status": "healthy"})
+
 @app.route("/")
 def index():
-    return {
-        "message": "Hello from OTEL Demo App!",
-        "endpoints": [
-            "/api/users",
-            "/api/process",
-            "/health"
-        ]
-    }
+    return app.response_class(_INDEX_JSON, mimetype="application/json")
 
 @app.route("/api/users")
 def get_users():
@@ -74,7 +100,8 @@ def get_users():
         span.set_attribute("db.operation", "select")
         
         # Simulate database query
-        time.sleep(random.uniform(0.1, 0.3))
+        if SIMULATE:
+            time.sleep(random.uniform(0.1, 0.3))
         
         users = [
             {"id": 1, "name": "Alice"},
@@ -83,7 +110,7 @@ def get_users():
         ]
         
         span.set_attribute("result.count", len(users))
-        request_counter.add(1, {"endpoint": "/api/users"})
+        request_counter.add(1, _ATTR_USERS)
         
         return {"users": users}
 
@@ -97,22 +124,25 @@ def process():
         # Step 1: Validate
         with tracer.start_as_current_span("validate_data") as span:
             span.set_attribute("step", "validation")
-            time.sleep(random.uniform(0.05, 0.15))
+            if SIMULATE:
+                time.sleep(random.uniform(0.05, 0.15))
         
         # Step 2: Process
         with tracer.start_as_current_span("process_data") as span:
             span.set_attribute("step", "processing")
-            time.sleep(random.uniform(0.1, 0.3))
+            if SIMULATE:
+                time.sleep(random.uniform(0.1, 0.3))
         
         # Step 3: Save
         with tracer.start_as_current_span("save_results") as span:
             span.set_attribute("step", "saving")
-            time.sleep(random.uniform(0.05, 0.2))
+            if SIMULATE:
+                time.sleep(random.uniform(0.05, 0.2))
             span.set_attribute("records_saved", 42)
         
         duration = (time.time() - start_time) * 1000
-        request_duration.record(duration, {"endpoint": "/api/process"})
-        request_counter.add(1, {"endpoint": "/api/process"})
+        request_duration.record(duration, _ATTR_PROCESS)
+        request_counter.add(1, _ATTR_PROCESS)
     
     return {"status": "success", "duration_ms": round(duration, 2)}
 
@@ -124,12 +154,12 @@ def error_endpoint():
         except Exception as e:
             span.record_exception(e)
             span.set_attribute("error", True)
-            request_counter.add(1, {"endpoint": "/api/error", "status": "error"})
+            request_counter.add(1, _ATTR_ERROR)
             return {"error": str(e)}, 500
 
 @app.route("/health")
 def health():
-    return {"status": "healthy"}
+    return app.response_class(_HEALTH_JSON, mimetype="application/json")
 
 if __name__ == "__main__":
     app.run(host="0.0.0.0", port=8000, debug=False)
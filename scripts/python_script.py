@@ -1,10 +1,13 @@
 #!/usr/bin/env python3
 
-import subprocess
+import asyncio
+import atexit
 import sys
 from datetime import datetime
 from pathlib import Path
 
+import asyncssh
+
 # Configuration
 SERVERS_FILE = "servers.txt"
 KEY_FILE = "/path/to/private/key"
@@ -12,10 +15,12 @@ CONF_FILE = "/path/to/splunk.conf"
 OLD_PASS = "XXX"
 NEW_PASS = "YYY"
 SSH_USER = "username"
+MAX_CONCURRENCY = 32
 
-# Counters
-success = 0
-failed = 0
+# Log file (one per run, opened once and line-buffered)
+LOG_PATH = Path(f"update_log_{datetime.now():%Y%m%d_%H%M%S}.txt")
+LOG_FH = LOG_PATH.open("a", buffering=1)
+atexit.register(LOG_FH.close)
 
 def log_message(msg, color=None):
     """Print and log messages"""
@@ -32,77 +37,94 @@ def log_message(msg, color=None):
     else:
         print(f"[{timestamp}] {msg}")
     
-    with open(f"update_log_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt", "a") as f:
-        f.write(f"[{timestamp}] {msg}\n")
-
-def run_ssh_command(server, command):
-    """Execute SSH command on remote server"""
-    try:
-        result = subprocess.run(
-            [
-                "ssh", 
-                "-i", KEY_FILE,
-                "-o", "ConnectTimeout=5",
-                "-o", "StrictHostKeyChecking=no",
-                f"{SSH_USER}@{server}",
-                command
-            ],
-            capture_output=True,
-            text=True,
-            timeout=30
-        )
-        return result.returncode == 0, result.stdout, result.stderr
-    except subprocess.TimeoutExpired:
-        return False, "", "Connection timeout"
-    except Exception as e:
-        return False, "", str(e)
+    LOG_FH.write(f"[{timestamp}] {msg}\n")
 
-def update_server(server):
+async def update_server(server, semaphore):
     """Update Splunk config on a single server"""
-    global success, failed
-    
-    log_message(f"Processing: {server}", 'yellow')
-    
-    # Create backup
-    log_message(f"  Creating backup...", 'yellow')
-    backup_cmd = f"cp {CONF_FILE} {CONF_FILE}.backup_$(date +%Y%m%d_%H%M%S)"
-    success_backup, _, err = run_ssh_command(server, backup_cmd)
-    
-    if not success_backup:
-        log_message(f"  ✗ Failed to connect or create backup: {err}", 'red')
-        failed += 1
-        return False
-    
-    # Update the file
-    log_message(f"  Updating password...", 'yellow')
-    update_cmd = f"sed -i 's/password={OLD_PASS}/password={NEW_PASS}/g' {CONF_FILE}"
-    success_update, _, err = run_ssh_command(server, update_cmd)
-    
-    if not success_update:
-        log_message(f"  ✗ Failed to update file: {err}", 'red')
-        failed += 1
-        return False
-    
-    # Verify the change
-    log_message(f"  Verifying change...", 'yellow')
-    verify_cmd = f"grep -c 'password={NEW_PASS}' {CONF_FILE}"
-    success_verify, output, _ = run_ssh_command(server, verify_cmd)
-    
-    if success_verify and output.strip().isdigit() and int(output.strip()) > 0:
-        log_message(f"  ✓ Successfully updated ({output.strip()} occurrence(s))", 'green')
-        success += 1
-        return True
-    else:
-        log_message(f"  ✗ Verification failed - restoring backup", 'red')
-        restore_cmd = f"cp {CONF_FILE}.backup_* {CONF_FILE} 2>/dev/null"
-        run_ssh_command(server, restore_cmd)
-        failed += 1
-        return False
+    async with semaphore:
+        log_message(f"Processing: {server}", 'yellow')
+        try:
+            async with asyncssh.connect(
+                server,
+                username=SSH_USER,
+                client_keys=[KEY_FILE],
+                known_hosts=None,
+                connect_timeout=5,
+                keepalive_interval=10,
+                keepalive_count_max=3
+            ) as conn:
+                return await asyncio.wait_for(update_config(conn, server), timeout=30)
+        except (OSError, asyncssh.Error, asyncio.TimeoutError) as e:
+            log_message(f"  [{server}] ✗ Failed to connect or update file: {e}", 'red')
+            return False
+
+async def copy_attrs(sftp, path, st):
+    """Give a newly written file the original config's owner, group and mode"""
+    # Changing the owner needs root and the group needs membership, so both are
+    # best effort; the mode is set afterwards since chown can clear mode bits.
+    # SFTP v3 sets uid and gid together, so the group-only fallback keeps our uid
+    own_uid = (await sftp.stat(path)).uid
+    for attrs in (asyncssh.SFTPAttrs(uid=st.uid, gid=st.gid), asyncssh.SFTPAttrs(uid=own_uid, gid=st.gid)):
+        try:
+            await sftp.setstat(path, attrs)
+            break
+        except asyncssh.SFTPError:
+            pass
+    await sftp.setstat(path, asyncssh.SFTPAttrs(permissions=st.permissions))
+
+async def update_config(conn, server):
+    """Back up, verify and atomically update the config over SFTP"""
+    old = f"password={OLD_PASS}"
+    new = f"password={NEW_PASS}"
+    
+    async with conn.start_sftp_client() as sftp:
+        async with sftp.open(CONF_FILE, 'r') as f:
+            data = await f.read()
+        
+        # Replace locally, so the passwords never pass through a remote shell
+        updated = data.replace(old, new)
+        count = updated.count(new)
+        
+        if count == 0:
+            log_message(f"  [{server}] ✗ Verification failed - '{old}' not found, file left unchanged", 'red')
+            return False
+        
+        if updated != data:
+            log_message(f"  [{server}] Creating backup and updating password...", 'yellow')
+            st = await sftp.stat(CONF_FILE)
+            backup_file = f"{CONF_FILE}.bak"
+            async with sftp.open(backup_file, 'w') as f:
+                await f.write(data)
+            await copy_attrs(sftp, backup_file, st)
+            
+            # Write to a temp file and rename it over the config, so an error or
+            # timeout mid-write never leaves a truncated config on the host
+            tmp_file = f"{CONF_FILE}.tmp"
+            try:
+                async with sftp.open(tmp_file, 'w') as f:
+                    await f.write(updated)
+                await copy_attrs(sftp, tmp_file, st)
+                await sftp.posix_rename(tmp_file, CONF_FILE)
+            except BaseException:
+                try:
+                    await asyncio.wait_for(sftp.remove(tmp_file), timeout=5)
+                except Exception:
+                    pass
+                raise
+    
+    log_message(f"  [{server}] ✓ Successfully updated ({count} occurrence(s))", 'green')
+    return True
+
+async def update_servers(servers):
+    """Update all servers concurrently, capped at MAX_CONCURRENCY connections"""
+    semaphore = asyncio.Semaphore(MAX_CONCURRENCY)
+    return await asyncio.gather(
+        *(update_server(server, semaphore) for server in servers),
+        return_exceptions=True
+    )
 
 def main():
     """Main execution"""
-    global success, failed
-    
     log_message("=== Splunk Config Update Script ===", 'yellow')
     log_message(f"Start time: {datetime.now()}")
     log_message(f"Config file: {CONF_FILE}")
@@ -118,8 +140,12 @@ def main():
         sys.exit(1)
     
     # Read servers
+    servers = []
     with open(SERVERS_FILE, 'r') as f:
-        servers = [line.strip() for line in f if line.strip() and not line.startswith('#')]
+        for line in f:
+            server = line.strip()
+            if server and server[0] != '#':
+                servers.append(server)
     
     total = len(servers)
     log_message(f"\nTotal servers to process: {total}\n")
@@ -131,8 +157,12 @@ def main():
         sys.exit(0)
     
     # Process servers
-    for server in servers:
-        update_server(server)
+    results = asyncio.run(update_servers(servers))
+    for server, result in zip(servers, results):
+        if isinstance(result, Exception):
+            log_message(f"  [{server}] ✗ Unexpected error: {result}", 'red')
+    success = sum(1 for result in results if result is True)
+    failed = len(results) - success
     
     # Summary
     log_message(f"\n=== Update Summary ===", 'yellow')
@@ -5,7 +5,7 @@ Run this after starting the containers
 """
 
 import requests
-import time
+import random
 import sys
 import os
 from concurrent.futures import ThreadPoolExecutor
@@ -13,24 +13,28 @@ from concurrent.futures import ThreadPoolExecutor
 # Allow overriding the target app URL via environment for containerized runs
 BASE_URL = os.getenv("BASE_URL", "http://localhost:8000")
 
+# Shared session so requests reuse pooled keep-alive connections
+SESSION = requests.Session()
+SESSION.mount("http://", requests.adapters.HTTPAdapter(pool_connections=10, pool_maxsize=20))
+
 def test_index():
     """Test the index endpoint"""
     print("[*] Testing GET /")
-    resp = requests.get(f"{BASE_URL}/")
+    resp = SESSION.get(f"{BASE_URL}/")
     print(f"    Status: {resp.status_code}")
     return resp.json()
 
 def test_users():
     """Test the users endpoint"""
     print("[*] Testing GET /api/users")
-    resp = requests.get(f"{BASE_URL}/api/users")
+    resp = SESSION.get(f"{BASE_URL}/api/users")
     print(f"    Status: {resp.status_code}, Users: {len(resp.json().get('users', []))}")
     return resp.json()
 
 def test_process():
     """Test the process endpoint"""
     print("[*] Testing GET /api/process")
-    resp = requests.get(f"{BASE_URL}/api/process")
+    resp = SESSION.get(f"{BASE_URL}/api/process")
     print(f"    Status: {resp.status_code}, Duration: {resp.json().get('duration_ms')}ms")
     return resp.json()
 
@@ -38,7 +42,7 @@ def test_error():
     """Test the error endpoint"""
     print("[*] Testing GET /api/error")
     try:
-        resp = requests.get(f"{BASE_URL}/api/error")
+        resp = SESSION.get(f"{BASE_URL}/api/error")
         print(f"    Status: {resp.status_code} - Error traced")
     except Exception as e:
         print(f"    Error: {e}")
@@ -46,7 +50,7 @@ def test_error():
 def test_health():
     """Test health check"""
     print("[*] Testing GET /health")
-    resp = requests.get(f"{BASE_URL}/health")
+    resp = SESSION.get(f"{BASE_URL}/health")
     print(f"    Status: {resp.status_code}")
     return resp.json()
 
@@ -55,10 +59,9 @@ def load_test(num_requests=20):
     print(f"\n[*] Generating {num_requests} requests for load testing...")
     
     def make_request():
-        endpoint = [test_users, test_process][int(time.time()) % 2]()
-        time.sleep(0.1)
+        random.choice((test_users, test_process))()
     
-    with ThreadPoolExecutor(max_workers=5) as executor:
+    with ThreadPoolExecutor(max_workers=10) as executor:
         futures = [executor.submit(make_request) for _ in range(num_requests)]
         for i, future in enumerate(futures):
             try: